@@ -2,19 +2,27 @@
 
 import geopandas as gpd
 import os
+import warnings
 import numpy as np
 import rasterio as rio
-import rioxarray
+import rioxarray  # noqa: F401 - import required for xarray's `rio` accessor
+import xarray as xr
 import folium
 import cartopy.crs as ccrs
 import cartopy.io.img_tiles as cimgt
 import matplotlib.pyplot as plt
+import shapely
 
 from datetime import datetime
 from geocube.vector import vectorize
 from typing import Union, Type, Tuple
+from shapely.geometry import MultiPolygon
 from shapely.geometry.polygon import Polygon
+from shapely.ops import transform
+from rasterio.mask import raster_geometry_mask
+from branca.colormap import LinearColormap
 from matplotlib import colormaps
+from matplotlib.colors import Normalize, to_hex
 from cartopy.mpl.geoaxes import GeoAxes
 from transport_performance.utils.defence import (
     _is_expected_filetype,
@@ -24,6 +32,7 @@ from transport_performance.utils.defence import (
     _enforce_file_extension,
     _check_iter_length,
 )
+from transport_performance.utils.raster import _get_transformer
 
 
 class RasterPop:
@@ -68,13 +77,17 @@ class RasterPop:
 
         self.__filepath = filepath
 
-        # record the crs of the data source without reading in data
+        # record the crs and profile (band count, transform, etc.) of the data
+        # source without reading in data - avoids reopening the file later
         with rio.open(filepath) as src:
             self.__crs = src.crs.to_string()
+            self.__profile = src.profile
 
         # set attributes to None to prevent plotting function calls
         self.pop_gdf = None
         self._uc_gdf = None
+        self.__data_range = None
+        self.__cell_tree = None
 
     def get_pop(
         self,
@@ -83,7 +96,7 @@ class RasterPop:
         round: bool = False,
         threshold: Union[int, float] = None,
         var_name: str = "population",
-        urban_centre_bounds: Type[Polygon] = None,
+        urban_centre_bounds: Union[Polygon, MultiPolygon] = None,
         urban_centre_crs: str = None,
         band: int = 1,
     ) -> Tuple[gpd.GeoDataFrame, gpd.GeoDataFrame]:
@@ -107,10 +120,11 @@ class RasterPop:
             thresholding will occur.
         var_name : str, optional
             The variable name, by default "population"
-        urban_centre_bounds : Type[Polygon], optional
-            Polygon defining an urban centre bounday, by default None meaning
-            information concerning whether the grid resides within the urban
-            centre will not be added.
+        urban_centre_bounds : Union[Polygon, MultiPolygon], optional
+            Polygon (or multi-polygon, when an urban centre is made up of
+            several parts) defining an urban centre bounday, by default None
+            meaning information concerning whether the grid resides within the
+            urban centre will not be added.
         urban_centre_crs : str, optional
             The urban centre polygon CRS, by default None meaning this is the
             same CRS as the input raster data. Only used when
@@ -266,25 +280,48 @@ class RasterPop:
         _type_defence(band, "band", int)
 
         # check if band selected is within raster file
-        with rio.open(self.__filepath) as rst:
-            if not 0 < band <= rst.count:
-                raise IndexError(
-                    f"Band number {band} not contained in raster. "
-                    f"Bands available: {tuple(range(1, rst.count + 1))}."
-                )
+        band_count = self.__profile["count"]
+        if not 0 < band <= band_count:
+            raise IndexError(
+                f"Band number {band} not contained in raster. "
+                f"Bands available: {tuple(range(1, band_count + 1))}."
+            )
 
-        # convert aoi bounds CRS if needed
-        if aoi_crs is not None:
-            gdf = gpd.GeoDataFrame(geometry=[aoi_bounds], crs=aoi_crs)
-            gdf = gdf.to_crs(self.__crs)
-            aoi_bounds = gdf.loc[0, "geometry"]
+        # convert aoi bounds CRS if needed, skipping when the CRSs match
+        if aoi_crs is not None and aoi_crs != self.__crs:
+            transformer = _get_transformer(aoi_crs, self.__crs)
+            aoi_bounds = transform(transformer.transform, aoi_bounds)
+
+        # read only the window of the selected band that covers the aoi, then
+        # mask cells outside of the aoi. the mask is only rasterised for the
+        # window (not the whole raster), using `all_touched` to include any
+        # cell touched by the aoi. data is read as float32 to halve the memory
+        # used by the subsequent processing steps.
+        with rio.open(self.__filepath) as src:
+            aoi_mask, win_transform, window = raster_geometry_mask(
+                src, [aoi_bounds], crop=True, all_touched=True
+            )
+            data = src.read(
+                band, window=window, out_dtype=np.float32, masked=True
+            ).filled(np.nan)
+        data[aoi_mask] = np.nan
 
-        # open and clip raster data - using `all_touched` method to include any
-        # cell touched and `from_disk` for improved reading speeds.
+        # build a DataArray with cell centre coordinates for the window
+        height, width = data.shape
         self._xds = (
-            rioxarray.open_rasterio(self.__filepath, masked=True)
-            .rio.clip([aoi_bounds], from_disk=True, all_touched=True)
-            .sel(band=band)
+            xr.DataArray(
+                data,
+                coords={
+                    "y": win_transform.f
+                    + win_transform.e * (np.arange(height) + 0.5),
+                    "x": win_transform.c
+                    + win_transform.a * (np.arange(width) + 0.5),
+                },
+                dims=("y", "x"),
+            )
+            .rio.write_crs(self.__crs)
+            .rio.write_transform(win_transform)
+            .rio.write_nodata(np.nan, encoded=True)
         )
 
         # checks that array has only two dimensions
@@ -311,9 +348,9 @@ class RasterPop:
 
     def _to_geopandas(self, round: bool = False) -> None:
         """Convert to geopandas dataframe."""
-        # vectorise to geopandas dataframe, setting data type to np.float32 -
-        # dtype is required by vecotrize function.
-        self.pop_gdf = vectorize(self._xds.astype(np.float32))
+        # vectorise to geopandas dataframe. `_xds` is already np.float32 (set
+        # in `_read_and_clip`), which is the dtype required by vectorize.
+        self.pop_gdf = vectorize(self._xds)
 
         # dropna to remove nodata regions and those below threshold (if set)
         self.pop_gdf = self.pop_gdf.dropna(subset=self.__var_name).reset_index(
@@ -326,34 +363,49 @@ class RasterPop:
                 self.__var_name
             ].astype("int")
 
+        # reset the cached data range used by the plotting methods and the
+        # cached spatial index of the grid cells
+        self.__data_range = None
+        self.__cell_tree = None
+
         # add an id for each cell - needed for r5py
         self.pop_gdf["id"] = np.arange(0, len(self.pop_gdf.index))
 
         # re-order columns for consistency
         self.pop_gdf = self.pop_gdf[["id", self.__var_name, "geometry"]]
 
+        # get centroid coordinates as arrays, converting them to EPSG:4326 for
+        # use in r5py. transforming the coordinate arrays directly with a
+        # cached transformer avoids rebuilding it on each call.
+        centroids = self.pop_gdf.geometry.centroid
+        centroid_x, centroid_y = centroids.x.to_numpy(), centroids.y.to_numpy()
+        if self.__crs != "EPSG:4326":
+            centroid_x, centroid_y = _get_transformer(
+                self.__crs, "EPSG:4326"
+            ).transform(centroid_x, centroid_y)
+
         # create centroid geodataframe using only necessary columns - save on
         # duplicated data, can join gdfs on id if ever needed.
-        self.centroid_gdf = self.pop_gdf[["id", "geometry"]].copy()
-        self.centroid_gdf["centroid"] = self.centroid_gdf.geometry.centroid
-        self.centroid_gdf.set_geometry("centroid", inplace=True)
-        self.centroid_gdf.drop("geometry", axis=1, inplace=True)
-
-        # convert centroids to EPSG:4326 for use in r5py
-        if self.__crs != "EPSG:4326":
-            self.centroid_gdf = self.centroid_gdf.to_crs("EPSG:4326")
+        self.centroid_gdf = gpd.GeoDataFrame(
+            {
+                "id": self.pop_gdf["id"].to_numpy(),
+                "centroid": shapely.points(centroid_x, centroid_y),
+            },
+            geometry="centroid",
+            crs="EPSG:4326",
+        )
 
     def _within_urban_centre(
         self,
-        urban_centre_bounds: Type[Polygon],
+        urban_centre_bounds: Union[Polygon, MultiPolygon],
         urban_centre_crs: str = None,
     ) -> None:
         """Categorise grid whether within urban centre.
 
         Parameters
         ----------
-        urban_centre_bounds : Type[Polygon]
-            Polygon defining urban centre bounday
+        urban_centre_bounds : Union[Polygon, MultiPolygon]
+            Polygon (or multi-polygon) defining urban centre bounday
         urban_centre_crs : str, optional
             The urban centre polygon CRS, by default None meaning this is the
             same CRS as the input raster data.
@@ -361,47 +413,84 @@ class RasterPop:
         Raises
         ------
         TypeError
-            When `urban_centre_bounds` is not a shapely Polygon.
+            When `urban_centre_bounds` is not a shapely Polygon or
+            MultiPolygon.
+
+        Notes
+        -----
+        A spatial index (STRtree) of the grid cells is built on first use and
+        reused for subsequent urban centre queries, until `_to_geopandas` is
+        called again.
 
         """
         # input type defences
-        _type_defence(urban_centre_bounds, "urban_centre_bounds", Polygon)
+        _type_defence(
+            urban_centre_bounds,
+            "urban_centre_bounds",
+            (Polygon, MultiPolygon),
+        )
         _type_defence(urban_centre_crs, "urban_centre_crs", (str, type(None)))
 
-        # match the crs if is one isn't provided - default assumption if this
-        # arg is not set, and a CRS is needed when building the gdf below
-        if urban_centre_crs is None:
-            urban_centre_crs = self.__crs
+        # if the provided crs does not match the raster crs, then convert the
+        # urban centre before querying. A missing crs is assumed to match.
+        if urban_centre_crs is not None and urban_centre_crs != self.__crs:
+            transformer = _get_transformer(urban_centre_crs, self.__crs)
+            urban_centre_bounds = transform(
+                transformer.transform, urban_centre_bounds
+            )
 
-        # build urban centre dataframe - set within column to true for sjoin
-        # such that nan values post join imply no within urban centre. Add an a
-        # column for the boundary name - only useful for plotting.
+        # build urban centre dataframe, adding a column for the boundary name -
+        # only useful for plotting.
         self.__UC_COL_NAME = "within_urban_centre"
         self._uc_gdf = gpd.GeoDataFrame(
-            geometry=[urban_centre_bounds], crs=urban_centre_crs
+            geometry=[urban_centre_bounds], crs=self.__crs
         )
-        self._uc_gdf.loc[:, self.__UC_COL_NAME] = True
         self._uc_gdf.loc[:, "boundary"] = "Urban Centre"
 
-        # if the provided crs does not match the raster crs, then convert the
-        # crs before the sjoin
-        if self._uc_gdf.crs != self.__crs:
-            self._uc_gdf = self._uc_gdf.to_crs(self.__crs)
-
-        # spatial join when cell is within urban centre, filling nan to false.
-        # drop index_right and boundary columns as they aren't needed.
-        self.pop_gdf = self.pop_gdf.sjoin(
-            self._uc_gdf, how="left", predicate="within"
-        ).drop(["index_right", "boundary"], axis=1)
-        self.pop_gdf[self.__UC_COL_NAME] = self.pop_gdf[
-            self.__UC_COL_NAME
-        ].fillna(False)
+        # query the grid cell spatial index for cells within the urban centre.
+        # the tree only tests the exact predicate on cells whose bounding box
+        # intersects the urban centre. 'contains' is evaluated as
+        # `urban_centre_bounds.contains(cell)`, i.e. the cell is within it.
+        if self.__cell_tree is None:
+            self.__cell_tree = shapely.STRtree(self.pop_gdf.geometry.values)
+        within_idx = self.__cell_tree.query(
+            urban_centre_bounds, predicate="contains"
+        )
+        within_uc = np.zeros(len(self.pop_gdf.index), dtype=bool)
+        within_uc[within_idx] = True
+        self.pop_gdf[self.__UC_COL_NAME] = within_uc
 
         # add within_urban_centre column to centroid data too - could be useful
-        # during selecting sources/destinations, so duplication is OK.
-        self.centroid_gdf = self.centroid_gdf.merge(
-            self.pop_gdf[["id", self.__UC_COL_NAME]], on="id"
-        )
+        # during selecting sources/destinations, so duplication is OK. Both
+        # dataframes are built row aligned (same ids, same order) in
+        # `_to_geopandas`, so the flags can be assigned without a merge.
+        self.centroid_gdf[self.__UC_COL_NAME] = within_uc
+
+    def _get_data_range(self) -> Tuple[float, float]:
+        """Get the minimum and maximum population values.
+
+        Computed from `pop_gdf`, which has no nan values, and cached so the
+        range is only calculated once across plotting calls.
+
+        Returns
+        -------
+        Tuple[float, float]
+            The minimum and maximum population values. Both are nan when
+            there is no population data (e.g., when all cells are below the
+            `threshold`).
+
+        """
+        if self.__data_range is None:
+            values = self.pop_gdf[self.__var_name].to_numpy()
+            if values.size == 0:
+                warnings.warn(
+                    "No population data to plot, the data range is undefined.",
+                    UserWarning,
+                )
+                self.__data_range = (np.nan, np.nan)
+            else:
+                self.__data_range = (values.min(), values.max())
+        return self.__data_range
 
     def _plot_folium(
         self,
@@ -417,6 +506,7 @@ class RasterPop:
         cmap: str = "viridis",
         boundary_color: str = "red",
         boundary_weight: int = 2,
+        max_cells: int = 10000,
     ) -> folium.Map:
         """Plot data onto a folium map.
 
@@ -439,6 +529,11 @@ class RasterPop:
             hexstring.
         boundary_weight : int, optional
             Weight (in pixels) of the boudary lines, by default 2.
+        max_cells : int, optional
+            Maximum number of grid cells to draw as individual polygons, by
+            default 10000. Above this, the population data is drawn as a
+            single image overlay (without per cell tooltips) to keep the map
+            size manageable.
 
         Returns
         -------
@@ -465,6 +560,7 @@ class RasterPop:
         _type_defence(cmap, "cmap", str)
         _type_defence(boundary_color, "boundary_color", str)
         _type_defence(boundary_weight, "boundary_weight", int)
+        _type_defence(max_cells, "max_cells", int)
 
         # add a base map with no tile - then is it not on a layer control
         m = folium.Map(tiles=None, control_scale=True, zoom_control=True)
@@ -477,10 +573,16 @@ class RasterPop:
             control=False,
         ).add_to(m)
 
-        # add the variable data to the map
-        self.pop_gdf.explore(
-            self.__var_name, cmap=cmap, name=self.__var_name.capitalize(), m=m
-        )
+        # add the variable data to the map, as an image for larger grids
+        if len(self.pop_gdf.index) > max_cells:
+            self._add_folium_image_overlay(m, cmap)
+        else:
+            self.pop_gdf.explore(
+                self.__var_name,
+                cmap=cmap,
+                name=self.__var_name.capitalize(),
+                m=m,
+            )
 
         # add the urban centre boundary, if one was provided
         if self._uc_gdf is not None:
@@ -560,6 +662,45 @@ class RasterPop:
 
         return m
 
+    def _add_folium_image_overlay(self, m: folium.Map, cmap: str) -> None:
+        """Add the population data to a folium map as an image overlay.
+
+        The data is reprojected to web mercator (as used by folium) and
+        coloured using `cmap`, such that the map holds a single image rather
+        than a polygon for each grid cell. nan cells are transparent.
+
+        Parameters
+        ----------
+        m : folium.Map
+            Folium map to add the image overlay (and a legend) to.
+        cmap : str
+            A colormap string recognised by `matplotlib`.
+
+        """
+        xds_3857 = self._xds.rio.reproject("EPSG:3857")
+        left, bottom, right, top = xds_3857.rio.transform_bounds("EPSG:4326")
+
+        # colour the data, with nan values mapped to the (transparent) 'bad'
+        # colour of the colormap
+        vmin_data, vmax_data = self._get_data_range()
+        plot_cmap = colormaps.get_cmap(cmap)
+        norm = Normalize(vmin=vmin_data, vmax=vmax_data)
+        image = plot_cmap(norm(xds_3857.values))
+
+        folium.raster_layers.ImageOverlay(
+            image=image,
+            bounds=[[bottom, left], [top, right]],
+            name=self.__var_name.capitalize(),
+        ).add_to(m)
+
+        # add a legend, matching the legend added by `explore`
+        LinearColormap(
+            [to_hex(c) for c in plot_cmap(np.linspace(0, 1, 10))],
+            vmin=vmin_data,
+            vmax=vmax_data,
+            caption=self.__var_name,
+        ).add_to(m)
+
     def _plot_cartopy(
         self,
         save: str = None,
@@ -670,23 +811,28 @@ class RasterPop:
         data_crs = ccrs.Mollweide()
         ax.add_image(map_tile, map_tile_zoom, cmap="gray")
 
-        # build a colormap and add pcolormesh plot data, setting vmin and vmax
-        # to match the whole colormap range. transform to data_crs required to
-        # project onto base map.
+        # build a colormap and add the plot data as an image (the grid is
+        # regular, so no need for a per-cell pcolormesh), setting vmin and
+        # vmax to match the whole colormap range. the extent is the outer
+        # edges of the grid, with the origin set by the direction of the y
+        # axis. transform to data_crs required to project onto base map.
         plot_cmap = colormaps.get_cmap(cmap)
-        plot_data = self._xds.to_numpy()
-        vmin_data = np.nanmin(plot_data)
-        vmax_data = np.nanmax(plot_data)
-        ctf = ax.pcolormesh(
-            self._xds.x.to_numpy(),
-            self._xds.y.to_numpy(),
-            plot_data,
+        vmin_data, vmax_data = self._get_data_range()
+        left, bottom, right, top = self._xds.rio.bounds()
+        ctf = ax.imshow(
+            self._xds.values,
+            extent=(left, right, bottom, top),
+            origin="upper" if self._xds.rio.transform().e < 0 else "lower",
             cmap=plot_cmap,
             vmin=vmin_data,
             vmax=vmax_data,
             transform=data_crs,
         )
 
+        # unlike pcolormesh, imshow does not autoscale the axis to the data -
+        # limit it to the data extent to avoid requesting a global tile set.
+        ax.set_extent((left, right, bottom, top), crs=data_crs)
+
         # add a colorbar - converting format of smaller numbers to exponents
         # modify the y label and reformat the tick axis to show min and max
         cbar = plt.colorbar(
@@ -798,7 +944,8 @@ class RasterPop:
 
         # handle matplotlib and rioxarry steps
         fig, ax = plt.subplots(figsize=figsize)
-        self._xds.plot(ax=ax)
+        vmin_data, vmax_data = self._get_data_range()
+        self._xds.plot(ax=ax, vmin=vmin_data, vmax=vmax_data)
         plt.tight_layout()
 
         # list of allowed formats to save plot
@@ -1,23 +1,23 @@
 """Functions to calculate urban centres following Eurostat definition."""
-from collections import Counter
-
 from typing import Union
 import pathlib
 
 import affine
 import geopandas as gpd
 import numpy as np
-import numpy.ma as ma
-import pandas as pd
 import rasterio
-import xarray as xr
-from geocube.vector import vectorize
-from pyproj import Transformer
-from rasterio.mask import raster_geometry_mask
-from rasterio.transform import rowcol
-from scipy.ndimage import generic_filter, label
+from rasterio.errors import WindowError
+from rasterio.features import geometry_window, shapes
+from rasterio.transform import rowcol, xy
+from scipy.ndimage import convolve, label
+from shapely.geometry import shape
 
 import transport_performance.utils.defence as d
+from transport_performance.utils.raster import _get_transformer
+
+# structuring elements for clustering, with and without diagonal adjacency
+_S_SQUARE = np.ones((3, 3), dtype=np.uint8)
+_S_CROSS = np.array([[0, 1, 0], [1, 1, 1], [0, 1, 0]], dtype=np.uint8)
 
 
 class UrbanCentre:
@@ -126,8 +126,9 @@ class UrbanCentre:
             the cell is filled with the cluster value. Needs to be between 5
             and 8.
         vector_nodata : int, optional
-            Value to fill empty cells. Select a negative value that you would
-            not expect to encounter within the raster population data.
+            Has no effect. Empty cells are masked out before the urban centre
+            is vectorized, so no fill value is needed. Kept for backwards
+            compatibility.
         buffer_size : int, optional
             Size of the buffer around the urban centre, in the distance units
             of the `centre_crs`. Defaults to 10,000 metres.
@@ -209,26 +210,31 @@ class UrbanCentre:
             )
 
         # convert uc to appropriate CRS before buffer estimation + return CRS
-        self.__buffer = gpd.GeoDataFrame(
-            geometry=(
-                self.__vectorized_uc.to_crs(buffer_estimation_crs)
-                .buffer(buffer_size)
-                .to_crs(self.crs)
-            ),
-            crs=self.crs,
+        buffer = (
+            self.__vectorized_uc.geometry.to_crs(buffer_estimation_crs)
+            .buffer(buffer_size)
+            .to_crs(self.crs)
         )
+        self.__buffer = gpd.GeoDataFrame(geometry=buffer, crs=self.crs)
 
         # bbox
+        uc_buffer_bbox = buffer.envelope
         self.__uc_buffer_bbox = gpd.GeoDataFrame(
-            geometry=self.__buffer.envelope, crs=self.crs
+            geometry=uc_buffer_bbox, crs=self.crs
         )
 
         # single GeoDataFrame containing all labelled outputs
-        self.output = pd.concat(
-            [self.__vectorized_uc, self.__buffer, self.__uc_buffer_bbox],
-            axis=0,
-        ).reset_index(drop=True)
-        self.output["label"] = ["vectorized_uc", "buffer", "bbox"]
+        self.output = gpd.GeoDataFrame(
+            {
+                "label": ["vectorized_uc", "buffer", "bbox"],
+                "geometry": [
+                    *self.__vectorized_uc.geometry,
+                    *buffer,
+                    *uc_buffer_bbox,
+                ],
+            },
+            crs=self.crs,
+        )
 
         return self.output
 
@@ -268,9 +274,13 @@ class UrbanCentre:
             if src.crs != bbox.crs:
                 raise ValueError("Raster and bounding box crs do not match")
 
-            _, affine, win = raster_geometry_mask(
-                src, bbox.geometry.values, crop=True, all_touched=True
-            )
+            # only the window around the bbox is needed, so skip the
+            # rasterisation of a geometry mask
+            try:
+                win = geometry_window(src, bbox.geometry.values)
+            except WindowError:
+                raise ValueError("Input shapes do not overlap raster.")
+            affine = src.window_transform(win)
 
             # band is clipped to extent of bbox
             rst = src.read(band_n, window=win)
@@ -307,7 +317,7 @@ class UrbanCentre:
 
         flag_array = masked_rst >= cell_pop_threshold
 
-        if np.sum(flag_array) == 0:
+        if not flag_array.any():
             raise ValueError(
                 "`cell_pop_threshold` value too high, "
                 "no cells over threshold"
@@ -330,7 +340,8 @@ class UrbanCentre:
         Returns
         -------
         tuple[0] : np.ndarray
-            Array including all clusters, each with an unique label.
+            Array including all clusters, each with an unique label. The
+            array is uint16 when the labels fit in it, int32 otherwise.
         tuple[1] : int
             Number of clusters identified.
 
@@ -338,12 +349,21 @@ class UrbanCentre:
         d._type_defence(flag_array, "flag_array", np.ndarray)
         d._type_defence(diag, "diag", bool)
 
-        if diag:
-            s = np.array([[1, 1, 1], [1, 1, 1], [1, 1, 1]])
-        else:
-            s = np.array([[0, 1, 0], [1, 1, 1], [0, 1, 0]])
+        s = _S_SQUARE if diag else _S_CROSS
+
+        # only label the bounding box of the flagged cells, the rest of the
+        # window is background
+        labelled_array = np.zeros(flag_array.shape, dtype=np.int32)
+        rows = np.flatnonzero(flag_array.any(axis=1))
+        cols = np.flatnonzero(flag_array.any(axis=0))
+        num_clusters = 0
+        if rows.size > 0:
+            box = (slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1))
+            labelled_array[box], num_clusters = label(flag_array[box], s)
 
-        labelled_array, num_clusters = label(flag_array, s)
+        # halve the memory traffic of the downstream passes over the labels
+        if num_clusters <= np.iinfo(np.uint16).max:
+            labelled_array = labelled_array.astype(np.uint16)
 
         return (labelled_array, num_clusters)
 
@@ -374,7 +394,8 @@ class UrbanCentre:
         Returns
         -------
         urban_centres : np.ndarray
-            Array including only clusters with population over the threshold.
+            Array including only clusters with population over the threshold,
+            with the same dtype as `labelled_array`.
 
         """
         d._type_defence(band, "band", np.ndarray)
@@ -382,48 +403,28 @@ class UrbanCentre:
         d._type_defence(num_clusters, "num_clusters", int)
         d._type_defence(cluster_pop_threshold, "cluster_pop_threshold", int)
 
-        urban_centres = labelled_array.copy()
-        for n in range(1, num_clusters + 1):
-            total_pop = ma.sum(ma.masked_where(urban_centres != n, band))
-
-            if total_pop < cluster_pop_threshold:
-                urban_centres[urban_centres == n] = 0
+        # total population of every cluster in a single pass, indexed by label
+        total_pop = np.bincount(
+            labelled_array.ravel(),
+            weights=band.ravel().astype(np.float64),
+            minlength=num_clusters + 1,
+        )
+        keep = total_pop >= cluster_pop_threshold
+        keep[0] = False
 
-        if len(urban_centres[urban_centres != 0]) == 0:
+        if not keep.any():
             raise ValueError(
                 "`cluster_pop_threshold` value too high, "
                 "no clusters over threshold"
             )
 
-        return urban_centres
-
-    def _custom_filter(self, win: np.ndarray, threshold: int) -> int:
-        """Check gap filling criteria.
-
-        Counts non-zero values within window and if higher than threshold and
-        cell is zero returns mode, else returns value of origin cell.
-
-        Parameters
-        ----------
-        win : np.ndarray
-            1-D flattened array of a 3x3 grid, where the centre is
-            win[len(win) // 2]. Note that cells outside of the edges are
-            filled with 0.
-        threshold : int
-            Number of cells that need to be filled to change the value of the
-            central cell.
-
-        Returns
-        -------
-        int
-            Value to impute to the central cell.
+        # remap every label in one gather, dropped clusters map to 0
+        lut = np.where(keep, np.arange(keep.size), 0).astype(
+            labelled_array.dtype
+        )
+        urban_centres = lut[labelled_array]
 
-        """
-        counter = Counter(win)
-        mode_count = counter.most_common(1)[0]
-        if (mode_count[1] >= threshold) & (win[len(win) // 2] == 0):
-            return mode_count[0]
-        return win[len(win) // 2]
+        return urban_centres
 
     def _fill_gaps(
         self, urban_centres: np.ndarray, cell_fill_threshold: int = 5
@@ -459,19 +460,60 @@ class UrbanCentre:
             )
 
         filled = urban_centres.copy()
-        n = 0
+
+        # a cell outside the bounding box of the clusters has at most 3
+        # cluster neighbours, so it is never filled. the passes below only
+        # run on a view of that bounding box, which is filled in place
+        rows = np.flatnonzero(filled.any(axis=1))
+        cols = np.flatnonzero(filled.any(axis=0))
+        if rows.size == 0:
+            return filled
+        sub = filled[rows[0] : rows[-1] + 1, cols[0] : cols[-1] + 1]
+
+        # count the cells of each cluster within every 3x3 window. cells
+        # outside of the edges count as 0. the threshold is a majority of
+        # the window, so at most one cluster can qualify for any empty cell.
+        # filling an empty cell with cluster n leaves the cells of every
+        # other cluster untouched, so cells can be filled in place while
+        # iterating over the clusters, without a copy of the previous pass
+        labels = np.unique(sub)
+        labels = labels[labels != 0]
+        kernel = np.ones((3, 3), dtype=np.uint8)
+
+        # only cells next to a cell filled in the previous pass can become
+        # fillable, so each pass after the first is restricted to the
+        # bounding box of the last fills, grown by 2 cells so the neighbour
+        # counts of the cells around the fills are complete
+        win = (slice(0, sub.shape[0]), slice(0, sub.shape[1]))
         while True:
-            n += 1
-            check = filled.copy()
-            filled = generic_filter(
-                filled,
-                function=self._custom_filter,
-                size=3,
-                mode="constant",
-                extra_keywords={"threshold": cell_fill_threshold},
+            frontier = sub[win]
+            # empty cells with enough filled neighbours, of any cluster. if
+            # there are none, no cluster can fill a cell and we are done
+            candidates = (frontier == 0) & (
+                convolve(
+                    (frontier != 0).astype(np.uint8), kernel, mode="constant"
+                )
+                >= cell_fill_threshold
             )
-            if np.array_equal(filled, check):
+            if not candidates.any():
+                return filled
+            changed = np.zeros_like(candidates)
+            for n in labels:
+                counts = convolve(
+                    (frontier == n).astype(np.uint8), kernel, mode="constant"
+                )
+                fill = candidates & (counts >= cell_fill_threshold)
+                frontier[fill] = n
+                changed |= fill
+            rows = np.flatnonzero(changed.any(axis=1))
+            cols = np.flatnonzero(changed.any(axis=0))
+            if rows.size == 0:
                 return filled
+            r0, c0 = win[0].start, win[1].start
+            win = (
+                slice(max(r0 + rows[0] - 2, 0), r0 + rows[-1] + 3),
+                slice(max(c0 + cols[0] - 2, 0), c0 + cols[-1] + 3),
+            )
 
     def _get_x_y(
         self,
@@ -508,7 +550,9 @@ class UrbanCentre:
             check_length=True,
             length=2,
         )
-        transformer = Transformer.from_crs(coords_crs, raster_crs)
+        # coords follow the axis order of `coords_crs`, e.g. (lat, lon) for
+        # EPSG:4326, so the authority order is kept
+        transformer = _get_transformer(coords_crs, raster_crs, always_xy=False)
         x, y = transformer.transform(*coords)
         row, col = rowcol(aff, x, y)
 
@@ -539,7 +583,7 @@ class UrbanCentre:
             crs string of the centre coordinates. If None, it will default
             to raster_crs.
         nodata : int, optional
-            Value to fill empty cells.
+            Has no effect, as empty cells are masked out before polygonising.
 
         Returns
         -------
@@ -581,16 +625,28 @@ class UrbanCentre:
 
         filt_array = uc_array == cluster_num
 
-        x_array = (
-            xr.DataArray(filt_array)
-            .astype("int32")
-            .rio.write_nodata(nodata)
-            .rio.write_transform(aff)
-            .rio.set_crs(raster_crs, inplace=True)
+        # only polygonise the bounding box of the cluster, shifting the
+        # transform to its top left cell
+        rows = np.flatnonzero(filt_array.any(axis=1))
+        cols = np.flatnonzero(filt_array.any(axis=0))
+        filt_array = filt_array[rows[0] : rows[-1] + 1, cols[0] : cols[-1] + 1]
+        x_off, y_off = xy(aff, rows[0], cols[0], offset="ul")
+        filt_aff = affine.Affine(aff.a, aff.b, x_off, aff.d, aff.e, y_off)
+
+        # polygonise the cluster cells only, empty cells are masked out. a
+        # boolean array shares its memory with a uint8 view, so no cast
+        geoms = [
+            shape(geom)
+            for geom, _ in shapes(
+                filt_array.view(np.uint8),
+                mask=filt_array,
+                connectivity=4,
+                transform=filt_aff,
+            )
+        ]
+        gdf = gpd.GeoDataFrame(
+            {"label": np.ones(len(geoms), dtype=np.int32), "geometry": geoms},
+            crs=raster_crs,
         )
 
-        gdf = vectorize(x_array)
-        gdf.columns = ["label", "geometry"]
-        gdf = gdf[gdf["label"] == 1]
-
         return gdf
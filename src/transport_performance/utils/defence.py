@@ -38,6 +38,34 @@ def _handle_path_like(
         returned. On windows a WindowsPath is returned. Both are children of
         pathlib.Path.
 
+    """
+    return pathlib.Path(_resolve_path_like(pth, param_nm))
+
+
+def _resolve_path_like(pth: Union[str, pathlib.Path], param_nm: str) -> str:
+    """Resolve a path-like parameter value to a real path string.
+
+    String counterpart of `_handle_path_like`, for internal callers that
+    only pass the path on to `os.path` functions, avoiding the construction
+    of a `pathlib.Path`.
+
+    Parameters
+    ----------
+    pth : (str, pathlib.Path)
+        The path to check.
+
+    param_nm : str
+        The name of the parameter being tested.
+
+    Raises
+    ------
+    TypeError: `pth` is not either of string or pathlib.Path.
+
+    Returns
+    -------
+    str
+        Real path of `pth`, without relative parts or symbolic links.
+
     """
     if not isinstance(pth, (str, pathlib.Path)):
         raise TypeError(f"`{param_nm}` expected path-like, found {type(pth)}.")
@@ -46,10 +74,7 @@ def _handle_path_like(
     pth_str = str(pth).replace("\\", "/")
 
     # Ensure returned path is not relative or contains symbolic links
-    pth = os.path.realpath(pth_str)
-    pth = pathlib.Path(pth)
-
-    return pth
+    return os.path.realpath(pth_str)
 
 
 def _check_parent_dir_exists(
@@ -85,7 +110,7 @@ def _check_parent_dir_exists(
         the create parameter is False.
 
     """
-    pth = _handle_path_like(pth, param_nm)
+    pth = _resolve_path_like(pth, param_nm)
     parent = os.path.dirname(pth)
     if not os.path.exists(parent):
         if create:
@@ -131,15 +156,11 @@ def _is_expected_filetype(
     None
 
     """
-    typing_dict = {
-        "pth": [pth, (str, pathlib.Path)],
-        "param_nm": [param_nm, str],
-        "check_existing": [check_existing, bool],
-        "exp_ext": [exp_ext, (str, list)],
-    }
-    for k, v in typing_dict.items():
-        _type_defence(v[0], k, v[-1])
-    pth = _handle_path_like(pth=pth, param_nm=param_nm)
+    _type_defence(pth, "pth", (str, pathlib.Path))
+    _type_defence(param_nm, "param_nm", str)
+    _type_defence(check_existing, "check_existing", bool)
+    _type_defence(exp_ext, "exp_ext", (str, list))
+    pth = _resolve_path_like(pth=pth, param_nm=param_nm)
     _, ext = os.path.splitext(pth)
     # lower for consistency
     ext = ext.lower()
@@ -148,16 +169,17 @@ def _is_expected_filetype(
         raise ValueError(f"No file extension was found in {pth}.")
     # treat cases where user forgot to include '.'
     if isinstance(exp_ext, list):
-        # lower everything for consistency
-        exp_ext = [ext.lower() for ext in exp_ext]
-        for i, e in enumerate(exp_ext):
+        # lower everything for consistency, in a single pass
+        norm_ext = []
+        for e in exp_ext:
+            e = e.lower()
             if not e.startswith(r"."):
                 warnings.warn(
-                    UserWarning(
-                        f"'.' was prepended to `exp_ext` value '{exp_ext[i]}'."
-                    )
+                    UserWarning(f"'.' was prepended to `exp_ext` value '{e}'.")
                 )
-                exp_ext[i] = "." + e
+                e = "." + e
+            norm_ext.append(e)
+        exp_ext = norm_ext
         is_correct = ext in exp_ext
 
     else:
@@ -226,6 +248,10 @@ def _type_defence(some_object, param_nm, types) -> None:
         `some_object` is not of type `types`.
 
     """
+    # exact type matches skip the isinstance MRO walk
+    if type(some_object) is types:
+        return None
+
     if not isinstance(some_object, types):
         raise TypeError(
             f"`{param_nm}` expected {types}. Got {type(some_object)}"
@@ -234,6 +260,31 @@ def _type_defence(some_object, param_nm, types) -> None:
     return None
 
 
+def _iterable_defence(iterable, param_nm) -> None:
+    """Defence checking for iterables. Not exported.
+
+    Looks up `__iter__` on the object's type, which is what the `Iterable`
+    ABC tests, without the overhead of the ABC `isinstance` check.
+
+    Parameters
+    ----------
+    iterable : Any
+        Object to test for iterability.
+    param_nm : str
+        Name of the parameter being checked.
+
+    Raises
+    ------
+    TypeError
+        `iterable` is not an Iterable.
+
+    """
+    if getattr(type(iterable), "__iter__", None) is None:
+        _type_defence(iterable, param_nm, Iterable)
+
+    return None
+
+
 def _check_iter_length(iterable: Iterable, param_nm: str, length: int) -> None:
     """Check the length of an iterable.
 
@@ -256,7 +307,7 @@ def _check_iter_length(iterable: Iterable, param_nm: str, length: int) -> None:
 
     """
     # check if iterable
-    _type_defence(iterable, param_nm, Iterable)
+    _iterable_defence(iterable, param_nm)
     # check if length is int
     _type_defence(length, "length", int)
 
@@ -313,7 +364,7 @@ def _check_iterable(
 
     """
     # check if iterable
-    _type_defence(iterable, param_nm, Iterable)
+    _iterable_defence(iterable, param_nm)
     # check if iterable_type is type
     _type_defence(iterable_type, "iterable_type", type)
     # check if iterable type matches expected
@@ -409,7 +460,7 @@ def _check_item_in_iter(item: str, iterable: Iterable, param_nm: str) -> None:
 
     """
     # check if iterable
-    _type_defence(iterable, param_nm, Iterable)
+    _iterable_defence(iterable, param_nm)
 
     if item not in iterable:
         raise ValueError(
@@ -437,14 +488,12 @@ def _check_attribute(obj, attr: str, message: str = None):
         An error raised if the attr does not exist
 
     """
-    err_msg = (
-        message
-        if message
-        else (f"{obj.__class__.__name__} has no attribute {attr}")
-    )
-
-    if attr not in obj.__dir__():
-        raise AttributeError(err_msg)
+    if not hasattr(obj, attr):
+        raise AttributeError(
+            message
+            if message
+            else (f"{obj.__class__.__name__} has no attribute {attr}")
+        )
 
 
 def _enforce_file_extension(
@@ -475,7 +524,7 @@ def _enforce_file_extension(
         The path with the correct file extension
 
     """
-    _handle_path_like(path, "path")
+    _type_defence(path, "path", (str, pathlib.Path))
     root, ext = os.path.splitext(path)
     if isinstance(exp_ext, str):
         exp_ext = [exp_ext]
@@ -3,7 +3,8 @@
 These were developed to support merging raster files together (e.g., to cover
 a larger area), and resampling to a different grid size (e.g., 100x100m grids
 to 200x200m grids). The original design intention is for these to form part of
-gridded population data pre-processing.
+gridded population data pre-processing. A cached CRS transformer factory is
+also provided, to reuse PROJ transformations across raster processing steps.
 """
 
 import os
@@ -12,7 +13,9 @@ import re
 import rioxarray
 import pathlib
 
+from functools import lru_cache
 from typing import Union
+from pyproj import Transformer
 from rioxarray.merge import merge_arrays
 from rasterio.warp import Resampling
 from transport_performance.utils.defence import (
@@ -189,3 +192,32 @@ def sum_resample_file(
     )
 
     xds_resampled.rio.to_raster(output_filepath)
+
+
+@lru_cache(maxsize=None)
+def _get_transformer(
+    crs_from: str, crs_to: str, always_xy: bool = True
+) -> Transformer:
+    """Get a cached transformer between two CRSs.
+
+    Building a `pyproj.Transformer` initialises PROJ, which is relatively
+    expensive, so transformers are cached per (`crs_from`, `crs_to`) pair.
+
+    Parameters
+    ----------
+    crs_from : str
+        CRS string to transform from (e.g. "ESRI:54009").
+    crs_to : str
+        CRS string to transform to (e.g. "EPSG:4326").
+    always_xy : bool, optional
+        If True (default), the transformer always expects (x, y)/(lon, lat)
+        ordering, matching the convention used by geopandas and shapely. If
+        False, the axis order defined by each CRS authority is used.
+
+    Returns
+    -------
+    Transformer
+        A cached transformer between `crs_from` and `crs_to`.
+
+    """
+    return Transformer.from_crs(crs_from, crs_to, always_xy=always_xy)
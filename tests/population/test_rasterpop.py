@@ -8,13 +8,16 @@ in Newport. The data vales do not represent any real or meaningfull measurments
 
 import os
 import pytest
+import folium
 import numpy as np
 import rasterio as rio
 import xarray as xr
 import geopandas as gpd
+import cartopy.crs as ccrs
 
 from typing import Type, Tuple
-from shapely.geometry import Polygon, Point
+from cartopy.mpl.geoaxes import GeoAxes
+from shapely.geometry import MultiPolygon, Polygon, Point
 from numpy.dtypes import Float64DType
 from pytest_lazyfixture import lazy_fixture
 from _pytest.python_api import RaisesContext
@@ -323,6 +326,7 @@ class TestRasterPop:
             rp._xds.to_numpy(), xarr_1_aoi[1]["post_clip"], equal_nan=True
         )
         assert len(rp._xds.shape) == 2
+        assert rp._xds.dtype == np.float32
 
         # call and test _to_geopandas and assert to geopandas expectations
         rp._to_geopandas()
@@ -330,6 +334,10 @@ class TestRasterPop:
             rp.pop_gdf.population, xarr_1_aoi[1]["geopandas"]
         )
         assert isinstance(rp.pop_gdf.population.dtype, Float64DType)
+        assert rp._get_data_range() == (
+            np.nanmin(xarr_1_aoi[1]["post_clip"]),
+            np.nanmax(xarr_1_aoi[1]["post_clip"]),
+        )
         assert (
             rp.pop_gdf.geometry.iloc[xarr_1_aoi[1]["grid"]["idx"]]
             == xarr_1_aoi[1]["grid"]["polygon"]
@@ -351,6 +359,16 @@ class TestRasterPop:
             rp.centroid_gdf.within_urban_centre, xarr_1_uc[1]["within_uc"]
         )
 
+        # check the urban centre flags are overwritten (not duplicated) when
+        # _within_urban_centre is called again, and rows remain id aligned
+        rp._within_urban_centre(xarr_1_uc[0])
+        assert list(rp.centroid_gdf.columns) == [
+            "id",
+            "centroid",
+            "within_urban_centre",
+        ]
+        assert np.array_equal(rp.centroid_gdf.id, rp.pop_gdf.id)
+
     @pytest.mark.parametrize(
         "round, threshold, expected, key",
         [
@@ -409,6 +427,105 @@ class TestRasterPop:
         # assert the population values are as expected
         assert np.array_equal(pop_gdf[var_name], expected[1][key])
 
+    def test_rasterpop_read_band(
+        self, xarr_1: xr.DataArray, xarr_1_aoi: tuple, tmp_path: str
+    ) -> None:
+        """Test reading a band from a multi-band raster with nodata values.
+
+        Parameters
+        ----------
+        xarr_1 : xr.DataArray
+            Dummy input data from `xarr_1` pytest fixture.
+        xarr_1_aoi : tuple
+            Dummy area of interest. Output from `xarr_1_aoi` fixture.
+        tmp_path : str
+            Temporary directory to use for pytest run.
+
+        """
+        # build a 2 band raster, where band 2 has a nodata cell (-200)
+        band_2 = xarr_1 * 2
+        band_2[1, 1] = -200
+        xarr_2_bands = (
+            xr.concat([xarr_1, band_2], dim="band")
+            .assign_coords(band=[1, 2])
+            .rio.write_crs(xarr_1.rio.crs)
+        )
+        fpath = os.path.join(tmp_path, "input_2_bands.tif")
+        xarr_2_bands.rio.to_raster(fpath)
+
+        # expect band 2 values, nan outside of the aoi and for nodata cells
+        exp_post_clip = xarr_1_aoi[1]["post_clip"] * 2
+        exp_post_clip[1, 1] = np.nan
+
+        rp = RasterPop(fpath)
+        rp._read_and_clip(aoi_bounds=xarr_1_aoi[0], band=2)
+        assert np.array_equal(
+            rp._xds.to_numpy(), exp_post_clip, equal_nan=True
+        )
+        assert rp._xds.rio.transform() == xarr_1.rio.transform()
+        assert np.array_equal(rp._xds.x, xarr_1.x)
+        assert np.array_equal(rp._xds.y, xarr_1.y)
+
+    def test_rasterpop_empty_data_range(
+        self, xarr_1_fpath: str, xarr_1_aoi: tuple
+    ) -> None:
+        """Test the data range when the threshold removes all cells.
+
+        Parameters
+        ----------
+        xarr_1_fpath : str
+            Filepath to dummy data
+        xarr_1_aoi : tuple
+            Dummy area of interest. Output from `xarr_1_aoi` fixture.
+
+        """
+        rp = RasterPop(xarr_1_fpath)
+        pop_gdf, _ = rp.get_pop(aoi_bounds=xarr_1_aoi[0], threshold=1000)
+        assert len(pop_gdf) == 0
+        with pytest.warns(UserWarning, match="No population data to plot"):
+            vmin, vmax = rp._get_data_range()
+        assert np.isnan(vmin) and np.isnan(vmax)
+
+    def test_rasterpop_multipolygon_uc(
+        self,
+        xarr_1_fpath: str,
+        xarr_1_aoi: tuple,
+        xarr_1_uc: tuple,
+    ) -> None:
+        """Test RasterPop with a multi-polygon urban centre.
+
+        Parameters
+        ----------
+        xarr_1_fpath : str
+            Filepath to dummy data
+        xarr_1_aoi : tuple
+            Dummy area of interest. Output from `xarr_1_aoi` fixture.
+        xarr_1_uc : tuple
+            Dummy urban centre fixture. Output from `xarr_1_uc` fixture.
+
+        """
+        # add a second part to the urban centre covering the top middle cell,
+        # i.e. the cell at index 1 in the output geopandas dataframe.
+        second_part = Polygon(
+            (
+                (-225600, 6036800),
+                (-225600, 6036700),
+                (-225500, 6036700),
+                (-225500, 6036800),
+                (-225600, 6036800),
+            )
+        )
+        uc_multi = MultiPolygon([xarr_1_uc[0], second_part])
+        exp_within_uc = xarr_1_uc[1]["within_uc"].copy()
+        exp_within_uc[1] = True
+
+        rp = RasterPop(xarr_1_fpath)
+        pop_gdf, centroid_gdf = rp.get_pop(
+            aoi_bounds=xarr_1_aoi[0], urban_centre_bounds=uc_multi
+        )
+        assert np.array_equal(pop_gdf.within_urban_centre, exp_within_uc)
+        assert np.array_equal(centroid_gdf.within_urban_centre, exp_within_uc)
+
     @pytest.mark.parametrize(
         "fpath, expected",
         [
@@ -750,6 +867,39 @@ class TestRasterPop:
         rp.plot(which=which, save=output_path)
         assert os.path.exists(output_path)
 
+    def test_plot_folium_image_overlay(
+        self,
+        xarr_1_fpath: str,
+        xarr_1_aoi: tuple,
+        tmp_path: str,
+    ) -> None:
+        """Test folium plot draws an image overlay for larger grids.
+
+        Parameters
+        ----------
+        xarr_1_fpath : str
+            filepath to dummy raster data
+        xarr_1_aoi : tuple
+            aoi polygon for dummy input
+        tmp_path : str
+            temporary path to save output within
+
+        """
+        rp = RasterPop(xarr_1_fpath)
+        rp.get_pop(xarr_1_aoi[0])
+        m = rp.plot(which="folium", max_cells=1)
+        overlays = [
+            child
+            for child in m._children.values()
+            if isinstance(child, folium.raster_layers.ImageOverlay)
+        ]
+        assert len(overlays) == 1
+
+        # check the map can be written to file
+        output_path = os.path.join(tmp_path, "outputs", "overlay.html")
+        rp.plot(which="folium", save=output_path, max_cells=1)
+        assert os.path.exists(output_path)
+
     def test_plot_before_get_data(self, xarr_1_fpath: str) -> None:
         """Test case where plot is called before getting data.
 
@@ -970,6 +1120,45 @@ class TestRasterPop:
         with does_not_raise():
             rp.plot(which="folium")
 
+    def test_plot_cartopy_image_extent(
+        self,
+        xarr_1_fpath: str,
+        xarr_1_aoi: tuple,
+        mocker,
+    ) -> None:
+        """Test the cartopy image extent, origin and axis extent.
+
+        The base map tile is patched out, so no tiles are requested.
+
+        Parameters
+        ----------
+        xarr_1_fpath : str
+            Filepath to dummy data.
+        xarr_1_aoi : tuple
+            Area of interest for dummy data.
+        mocker
+            pytest-mock fixture, used to patch out the base map tile and spy
+            on the imshow call.
+
+        """
+        rp = RasterPop(xarr_1_fpath)
+        rp.get_pop(xarr_1_aoi[0])
+        mocker.patch.object(GeoAxes, "add_image")
+        imshow_spy = mocker.spy(GeoAxes, "imshow")
+        ax = rp.plot(which="cartopy")
+
+        # the image should span the outer edges of the (y descending) grid
+        left, bottom, right, top = rp._xds.rio.bounds()
+        _, kwargs = imshow_spy.call_args
+        assert kwargs["extent"] == (left, right, bottom, top)
+        assert kwargs["origin"] == "upper"
+
+        # the axis should be limited to the data, not a global extent
+        x0, x1, y0, y1 = ax.get_extent(crs=ccrs.Mollweide())
+        assert x0 <= left and x1 >= right
+        assert np.isclose(y0, bottom) and np.isclose(y1, top)
+        assert (x1 - x0) < 10 * (right - left)
+
     def test_plot_cartopy_unknown_attr_location(
         self,
         xarr_1_fpath: str,
@@ -25,6 +25,7 @@ import pytest
 import rasterio as rio
 
 from pytest_lazyfixture import lazy_fixture
+from scipy.ndimage import generic_filter, label
 from shapely.geometry import Polygon
 from typing import Union, Type
 from _pytest.python_api import RaisesContext
@@ -1272,6 +1273,57 @@ def test__check_cluster_pop_raises(dummy_pop_array):
         )
 
 
+def test__cluster_cells_dtype(dummy_pop_array):
+    """Test _cluster_cells returns compact labels."""
+    uc = ucc.UrbanCentre(dummy_pop_array)
+    flags = np.array([[1, 0, 1], [0, 0, 0], [1, 0, 1]], dtype=bool)
+    labelled, num_clusters = uc._cluster_cells(flags)
+    assert labelled.dtype == np.uint16
+    assert num_clusters == 4
+    assert np.array_equal(labelled, [[1, 0, 2], [0, 0, 0], [3, 0, 4]])
+
+
+@pytest.mark.parametrize("diag", [True, False])
+def test__cluster_cells_sparse(dummy_pop_array: str, diag: bool):
+    """Test _cluster_cells on flags away from the array edges.
+
+    Parameters
+    ----------
+    dummy_pop_array : str
+        Filepath to dummy raster data.
+    diag : bool
+        If True, diagonals are considered as adjacent.
+
+    """
+    uc = ucc.UrbanCentre(dummy_pop_array)
+    flags = np.zeros((20, 30), dtype=bool)
+    flags[5:8, 10:12] = True
+    flags[8, 12] = True
+    flags[12:14, 20:25] = True
+    labelled, num_clusters = uc._cluster_cells(flags, diag)
+    structure = np.ones((3, 3)) if diag else None
+    expected, expected_num = label(flags, structure)
+    assert num_clusters == expected_num
+    assert np.array_equal(labelled, expected)
+
+    # no flagged cells
+    labelled, num_clusters = uc._cluster_cells(np.zeros((4, 4), dtype=bool))
+    assert num_clusters == 0
+    assert not labelled.any()
+
+
+def test__check_cluster_pop(dummy_pop_array):
+    """Test _check_cluster_pop drops clusters under the threshold."""
+    uc = ucc.UrbanCentre(dummy_pop_array)
+    band = np.array([[10.0, 10.0, 0.0, 5.0], [0.0, 0.0, 0.0, 5.0]])
+    labelled = np.array([[1, 1, 0, 2], [0, 0, 0, 2]], dtype=np.int32)
+    out = uc._check_cluster_pop(band, labelled, 2, cluster_pop_threshold=15)
+    assert np.array_equal(out, np.array([[1, 1, 0, 0], [0, 0, 0, 0]]))
+    assert out.dtype == labelled.dtype
+    # input labels are not modified
+    assert labelled[0, 3] == 2
+
+
 def test__fill_gaps_raises(dummy_pop_array):
     """Test _fill_gaps raises."""
     uc = ucc.UrbanCentre(dummy_pop_array)
@@ -1282,6 +1334,50 @@ def test__fill_gaps_raises(dummy_pop_array):
         uc._fill_gaps(urban_centres="not an array")
 
 
+@pytest.mark.parametrize("cell_fill_t", [5, 6, 7, 8])
+def test__fill_gaps(dummy_pop_array: str, cell_fill_t: int):
+    """Test _fill_gaps against a per-window mode filter.
+
+    Parameters
+    ----------
+    dummy_pop_array : str
+        Filepath to dummy raster data.
+    cell_fill_t : int
+        Number of cells around a specific empty cell needed for this cell
+        to be filled.
+
+    """
+
+    def _mode_filter(win, threshold):
+        values, counts = np.unique(win, return_counts=True)
+        centre = win[len(win) // 2]
+        if (counts.max() >= threshold) & (centre == 0):
+            return values[counts.argmax()]
+        return centre
+
+    rng = np.random.default_rng(42)
+    clusters = rng.choice([0, 1, 2], size=(40, 40), p=[0.4, 0.3, 0.3])
+
+    expected = clusters.copy()
+    while True:
+        check = expected
+        expected = generic_filter(
+            check,
+            function=_mode_filter,
+            size=3,
+            mode="constant",
+            extra_keywords={"threshold": cell_fill_t},
+        )
+        if np.array_equal(expected, check):
+            break
+
+    uc = ucc.UrbanCentre(dummy_pop_array)
+    filled = uc._fill_gaps(clusters, cell_fill_t)
+    assert np.array_equal(filled, expected)
+    # input array is left untouched
+    assert not np.shares_memory(filled, clusters)
+
+
 def test__vectorize_uc_raises(dummy_pop_array):
     """Test _vectorize_uc raises."""
     uc = ucc.UrbanCentre(dummy_pop_array)
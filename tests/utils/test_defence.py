@@ -2,6 +2,7 @@
 import re
 import os
 import pathlib
+from collections.abc import Iterable
 from typing import Union, Type
 
 import pytest
@@ -26,6 +27,7 @@ from transport_performance.utils.defence import (
     _handle_path_like,
     _is_expected_filetype,
     _enforce_file_extension,
+    _iterable_defence,
 )
 from transport_performance.gtfs.validation import GtfsInstance
 
@@ -384,6 +386,40 @@ class Test_TypeDefence(object):
         _type_defence(None, "None", (list, dict, type(None)))
 
 
+class Test_IterableDefence(object):
+    """Test internal _iterable_defence."""
+
+    def test__iterable_defence_matches_abc(self):
+        """Func agrees with the Iterable ABC."""
+
+        class NotIterable:
+            __iter__ = None
+
+        class Registered:
+            __iter__ = None
+
+        Iterable.register(Registered)
+
+        for obj in [
+            [],
+            (),
+            {},
+            set(),
+            "str",
+            (i for i in range(2)),
+            {}.keys(),
+        ]:
+            _iterable_defence(obj, "obj")
+        _iterable_defence(Registered(), "registered")
+
+        for obj in [True, 1, 1.0, None, NotIterable()]:
+            with pytest.raises(
+                TypeError,
+                match="`obj` expected .*Iterable.* Got .*",
+            ):
+                _iterable_defence(obj, "obj")
+
+
 @pytest.fixture(scope="function")
 def test_df():
     """A test fixture for an example dataframe."""
@@ -23,6 +23,7 @@ from _pytest.python_api import RaisesContext
 from transport_performance.utils.raster import (
     merge_raster_files,
     sum_resample_file,
+    _get_transformer,
 )
 from transport_performance.utils.test_utils import _np_to_rioxarray
 
@@ -498,3 +499,23 @@ class TestUtilsRaster:
                 output_filepath=output_filepath,
                 resample_factor=resample_factor,
             )
+
+    def test__get_transformer(self) -> None:
+        """Test _get_transformer caching and axis ordering."""
+        transformer = _get_transformer("EPSG:4326", "EPSG:27700")
+
+        # check the same transformer object is reused for the same CRS pair
+        assert _get_transformer("EPSG:4326", "EPSG:27700") is transformer
+        assert _get_transformer("EPSG:27700", "EPSG:4326") is not transformer
+
+        # check (lon, lat) ordering is expected - ONS Newport site
+        x, y = transformer.transform(-3.0306, 51.5664)
+        assert 320000 < x < 340000
+        assert 180000 < y < 190000
+
+        # check authority ordering, (lat, lon) for EPSG:4326, when requested
+        authority = _get_transformer("EPSG:4326", "EPSG:27700", False)
+        assert authority is not transformer
+        x, y = authority.transform(51.5664, -3.0306)
+        assert 320000 < x < 340000
+        assert 180000 < y < 190000